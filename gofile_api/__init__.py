@@ -7,11 +7,21 @@ Get an available server. <br>
 Upload a file, to a directory, or to the root folder. <br>
 Create a guest account. <br>
 Get contents of a folder. <br>
+Watch folders for added, removed and modified content. <br>
 Create a folder. <br>
+Create a whole folder tree, from a nested mapping or a local directory. <br>
 Get the account information. <br>
-Set option for a content id.
+Set option for a content id. <br>
+Run batch operations with adaptive concurrency. <br>
+Limit upload bandwidth and prioritize interactive requests over bulk transfers.
 """
 from .api import GoFileSession as GoFileSession
+from .concurrency import (
+    AdaptiveConcurrencyController as AdaptiveConcurrencyController,
+    ConcurrencyDecision as ConcurrencyDecision,
+)
+from .watcher import FolderWatcher as FolderWatcher, WatchEvent as WatchEvent
+from .transfers import TransferScheduler as TransferScheduler
 from .exceptions import (
     InvalidExpirationError as InvalidExpirationError,
     PasswordRequiredError as PasswordRequiredError,
@@ -27,4 +37,5 @@ from .exceptions import (
     InvalidTokenException as InvalidTokenException,
     ContentExpiredError as ContentExpiredError,
     RateLimitException as RateLimitException,
+    TreeCreationError as TreeCreationError,
 )
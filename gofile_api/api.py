@@ -7,9 +7,14 @@ from .consts import (
     WRONG_OWNER,
 )
 from requests import RequestException, delete, post, put, get
-from typing import Iterable, NoReturn, Literal
+from typing import Iterable, Mapping, NoReturn, Literal
+from os import PathLike, path, scandir
+from threading import local
 from hashlib import sha256
 from random import choices
+from .concurrency import AdaptiveConcurrencyController, run_batch
+from .watcher import FolderWatcher
+from .transfers import ThrottledMultipartBody, TransferScheduler
 from .exceptions import (
     InvalidExpirationError,
     PasswordRequiredError,
@@ -25,6 +30,7 @@ from .exceptions import (
     InvalidTokenException,
     ContentExpiredError,
     RateLimitException,
+    TreeCreationError,
 )
 
 
@@ -32,11 +38,27 @@ class GoFileSession:
     """Class for communicating with the GoFile API."""
 
     def __init__(
-        self, max_retries: int = 5, raw_output: bool = False, token: str | None = None
+        self,
+        max_retries: int = 5,
+        raw_output: bool = False,
+        token: str | None = None,
+        concurrency: AdaptiveConcurrencyController | None = None,
+        scheduler: TransferScheduler | None = None,
+        request_timeout: float | None = 30.0,
     ) -> None:
+        """concurrency: Controls how many requests batch operations send in parallel. If None is given, a default AdaptiveConcurrencyController is used.\n
+        scheduler: Shapes upload bandwidth and lets higher priority requests go first. If None is given, uploads are sent as fast as possible.\n
+        request_timeout: Seconds to wait for the api to connect or send data before the request is retried as congested. None waits forever.
+        """
         self.__max_retries = max_retries
-        self.__retry_count = 0
+        # batch operations retry from several threads at once
+        self.__retry_state = local()
         self.__raw = raw_output
+        if concurrency == None:
+            concurrency = AdaptiveConcurrencyController()
+        self.__concurrency = concurrency
+        self.__scheduler = scheduler
+        self.__request_timeout = request_timeout
         self.__token = token
         if token == None:
             self.__token = self.create_account()
@@ -47,7 +69,9 @@ class GoFileSession:
         if raw == None:
             raw = self.__raw
         try:
-            response = get("https://api.gofile.io/getServer")
+            response = get(
+                "https://api.gofile.io/getServer", timeout=self.__request_timeout
+            )
         except RequestException:
             self.__next_retry("while getting available server")
             return self.get_server(raw)
@@ -69,6 +93,10 @@ class GoFileSession:
                     raise UnknownResponseException(
                         f"error while getting server, status: {status}"
                     )
+            case 429:
+                raise RateLimitException(
+                    "rate limited (too many requests in a short period of time)"
+                )
             case _:
                 raise UnknownResponseException(
                     f"error while getting server, status: {status}\nresponse code: {response.status_code}"
@@ -85,9 +113,12 @@ class GoFileSession:
         expiration_timestamp: float | int | None = None,
         parent_folder_description: str | None = None,
         parent_folder_tags: Iterable[str] | None = None,
+        priority: str | None = None,
+        rate_limit: float | None = None,
     ) -> dict:
         """file_path: The path to the file that will be uploaded.\n
         parent_folder_id: The parent folder ID. If None is given, a new folder is created to recieve the file.\n
+        The parent_folder_* options and expiration_timestamp only apply to that new folder.\n
         raw: Return raw json.\n
         parent_folder_name: The parent folder name. If None is given, a random name is generated.\n
         parent_folder_public: Should the parent folder be public for all users to see. Default is True.\n
@@ -95,6 +126,8 @@ class GoFileSession:
         expiration_timestamp: When the parent folder should expire, in unix-time.\n
         description: Description of the parent folder.\n
         tags: The tags for the parent folder.\n
+        priority: The transfer scheduler priority class. If None is given, the scheduler's default is used.\n
+        rate_limit: Upload limit in bytes per second for this file alone. Only used when the session has a transfer scheduler.\n
         """
         if raw == None:
             raw = self.__raw
@@ -110,16 +143,35 @@ class GoFileSession:
                 tags=parent_folder_tags,
             )
         else:
-            parent_folder_id = self.__root_folder
+            created_new_folder = False
         payload = {"token": self.__token}
         payload["folderId"] = parent_folder_id
         with open(file_path, "rb") as file_opened:
             try:
-                response = post(
-                    f"https://{self.get_server()}.gofile.io/uploadFile",
-                    data=payload,
-                    files={"file": file_opened},
-                )
+                url = f"https://{self.get_server()}.gofile.io/uploadFile"
+                if self.__scheduler == None:
+                    response = post(
+                        url,
+                        data=payload,
+                        files={"file": file_opened},
+                        timeout=self.__request_timeout,
+                    )
+                else:
+                    with self.__scheduler.transfer(priority, rate_limit) as transfer:
+                        body = ThrottledMultipartBody(
+                            payload,
+                            "file",
+                            path.basename(file_path),
+                            file_opened,
+                            path.getsize(file_path),
+                            transfer,
+                        )
+                        response = post(
+                            url,
+                            data=body,
+                            headers={"Content-Type": body.content_type},
+                            timeout=self.__request_timeout,
+                        )
             except RequestException:
                 self.__next_retry(
                     f"while uploading file ({file_path}) to {parent_folder_id}"
@@ -134,6 +186,8 @@ class GoFileSession:
                     expiration_timestamp=expiration_timestamp,
                     parent_folder_description=parent_folder_description,
                     parent_folder_tags=parent_folder_tags,
+                    priority=priority,
+                    rate_limit=rate_limit,
                 )
         self.__reset_retry_count()
         response_json: dict = response.json()
@@ -141,21 +195,7 @@ class GoFileSession:
         match response.status_code:
             case 200:
                 if status == "ok":
-                    self.set_option(parent_folder_id, "public", parent_folder_public)
-                    if parent_folder_password != None:
-                        self.set_option(
-                            parent_folder_id, "password", parent_folder_password
-                        )
-                    if expiration_timestamp != None:
-                        self.set_option(
-                            parent_folder_id, "expire", float(expiration_timestamp)
-                        )
-                    if parent_folder_tags != None:
-                        self.set_option(parent_folder_id, "tags", parent_folder_tags)
-                    if parent_folder_description != None:
-                        self.set_option(
-                            parent_folder_id, "description", parent_folder_description
-                        )
+                    # the parent folder options were already set by create_folder, an existing folder is left as is
                     if raw:
                         return response_json
                     return response_json["data"]
@@ -167,6 +207,10 @@ class GoFileSession:
                     )
             case 401 | 403:
                 raise InvalidTokenException("invalid token")
+            case 429:
+                raise RateLimitException(
+                    "rate limited (too many requests in a short period of time)"
+                )
             case _:
                 raise UnknownResponseException(
                     f"error while uploading file, status: {status}\nresponse code: {response.status_code}"
@@ -194,12 +238,18 @@ class GoFileSession:
             ).hexdigest()  # gofile uses client side hashing lol
         headers = {"Content-Type": "application/json"}
         try:
+            # listings send no bytes worth shaping, so they never wait on (or show up in) the transfer scheduler
             response = get(
-                "https://api.gofile.io/getContent", params=params, headers=headers
+                "https://api.gofile.io/getContent",
+                params=params,
+                headers=headers,
+                timeout=self.__request_timeout,
             )
         except RequestException:
             self.__next_retry(f"while getting contents of: {content_id}")
-            return self.get_content(content_id=content_id, raw=raw)
+            return self.get_content(
+                content_id=content_id, folder_password=folder_password, raw=raw
+            )
         self.__reset_retry_count()
         response_json: dict = response.json()
         status = response_json.get("status")
@@ -219,12 +269,18 @@ class GoFileSession:
                     raise WrongOwnerError(f"you do not own {content_id}")
                 elif status == ERROR_EXPIRE:
                     raise ContentExpiredError(f"content id {content_id} has expired")
+                elif status == ERROR_NOT_FOUND:
+                    raise ContentNotFoundError(f"content id {content_id} not found")
                 else:
                     raise UnknownResponseException(
                         f"error while getting content(s) of {content_id}\nstatus: {status}"
                     )
             case 401 | 403:
                 raise InvalidTokenException("invalid token")
+            case 429:
+                raise RateLimitException(
+                    "rate limited (too many requests in a short period of time)"
+                )
             case _:
                 raise UnknownResponseException(
                     f"error while getting content(s) of {content_id}\nresponse code: {response.status_code}"
@@ -235,7 +291,9 @@ class GoFileSession:
         if raw == None:
             raw = self.__raw
         try:
-            response = get("https://api.gofile.io/createAccount")
+            response = get(
+                "https://api.gofile.io/createAccount", timeout=self.__request_timeout
+            )
         except RequestException:
             self.__next_retry("while creating account")
             return self.create_account(raw)
@@ -285,63 +343,90 @@ class GoFileSession:
             parent_folder_id = self.__root_folder
         if folder_name == None:
             folder_name = "".join(choices("abcdefghijklmnopqrstuvwxyz1234567890", k=5))
-        payload = {
-            "token": self.__token,
-            "folderName": folder_name,
-            "parentFolderId": parent_folder_id,
-        }
-        headers = {"Content-Type": "application/json"}
-        try:
-            response = put(
-                "https://api.gofile.io/createFolder", json=payload, headers=headers
-            )
-        except RequestException:
-            self.__next_retry(
-                f"creating folder {folder_name}\nparent folder id: {parent_folder_id}"
-            )
-            return self.create_folder(
-                raw=raw,
-                folder_name=folder_name,
-                parent_folder_id=parent_folder_id,
-                public=public,
-                folder_password=folder_password,
-                expiration_timestamp=expiration_timestamp,
-                description=description,
-                tags=tags,
+        response_json = self.__create_folder(folder_name, parent_folder_id)
+        content_id = response_json["data"]["id"]
+        for option_type, value in self.__folder_options(
+            public, folder_password, expiration_timestamp, description, tags
+        ):
+            self.set_option(content_id, option_type, value)
+        if raw:
+            return response_json
+        return content_id
+
+    def create_tree(
+        self,
+        spec: Mapping | str | PathLike,
+        parent_folder_id: str | None = None,
+        public: bool = True,
+        folder_password: str | None = None,
+        expiration_timestamp: float | int | None = None,
+        description: str | None = None,
+        tags: Iterable[str] | None = None,
+    ) -> dict[str, str]:
+        """spec: The folders to create. Either a nested mapping of folder name (which may not contain "/") to its subfolders (None or an empty mapping for no subfolders),
+        or the path to a local directory, whose directory layout (including itself) is mirrored.\n
+        parent_folder_id: The folder to create the tree in. If None is given, the root folder will be used.\n
+        public, folder_password, expiration_timestamp, description, tags: Options applied to every created folder, see create_folder.\n
+        All folders of the same depth are created in parallel once their parents exist, and get their options before the next depth is started.\n
+        Returns a dict of "/" separated path (relative to the parent folder) to folder ID.
+        If a request fails, TreeCreationError is raised with the folders created so far.
+        """
+        if parent_folder_id == None:
+            parent_folder_id = self.__root_folder
+        if not isinstance(spec, Mapping):
+            spec = {path.basename(path.abspath(spec)): self.__local_tree(spec)}
+        self.__check_tree(spec, "")
+        options = self.__folder_options(
+            public, folder_password, expiration_timestamp, description, tags
+        )
+        folder_ids: dict[str, str] = {}
+        # (path, name, subfolders, parent folder id)
+        wave = [
+            (name, name, children, parent_folder_id) for name, children in spec.items()
+        ]
+        while wave:
+            responses = run_batch(
+                self.__concurrency,
+                lambda folder: self.__create_folder(folder[1], folder[3]),
+                wave,
+                return_exceptions=True,
+                operation="create_folder",
             )
-        self.__reset_retry_count()
-        response_json: dict = response.json()
-        status = response_json.get("status")
-        match response.status_code:
-            case 200:
-                content_id = response_json["data"]["id"]
-                if status == "ok":
-                    self.set_option(content_id, "public", public)
-                    if folder_password != None:
-                        self.set_option(content_id, "password", folder_password)
-                    if expiration_timestamp != None:
-                        self.set_option(
-                            content_id, "expire", float(expiration_timestamp)
-                        )
-                    if tags != None:
-                        self.set_option(content_id, "tags", tags)
-                    if description != None:
-                        self.set_option(content_id, "description", description)
-                    if raw:
-                        return response_json
-                    return content_id
-                elif status == WRONG_FOLDER:
-                    raise WrongFolderError(f"invalid parent folder: {parent_folder_id}")
-                else:
-                    raise UnknownResponseException(
-                        f"error while creating folder {folder_name}\nparent folder id: {parent_folder_id}"
-                    )
-            case 401 | 403:
-                raise InvalidTokenException("invalid token")
-            case _:
-                raise UnknownResponseException(
-                    f"error while creating folder {folder_name}\nparent folder id: {parent_folder_id}\nresponse code: {response.status_code}"
+            errors = [
+                response for response in responses if isinstance(response, Exception)
+            ]
+            next_wave = []
+            created = []
+            for (folder_path, _, children, _), response in zip(wave, responses):
+                if isinstance(response, Exception):
+                    continue
+                folder_id = response["data"]["id"]
+                folder_ids[folder_path] = folder_id
+                created.append(folder_id)
+                next_wave.extend(
+                    (f"{folder_path}/{name}", name, grandchildren, folder_id)
+                    for name, grandchildren in (children or {}).items()
                 )
+            # set the options before going deeper, so a failure never leaves folders without their password
+            results = run_batch(
+                self.__concurrency,
+                lambda option: self.set_option(*option),
+                [
+                    (folder_id, option_type, value)
+                    for folder_id in created
+                    for option_type, value in options
+                ],
+                return_exceptions=True,
+                operation="set_option",
+            )
+            errors.extend(result for result in results if isinstance(result, Exception))
+            if errors:
+                raise TreeCreationError(
+                    f"error while creating folder tree, {len(folder_ids)} folders were created: {errors[0]}",
+                    folder_ids,
+                ) from errors[0]
+            wave = next_wave
+        return folder_ids
 
     def get_account_details(self, raw: bool | None = None) -> dict:
         """raw: return raw json"""
@@ -354,6 +439,7 @@ class GoFileSession:
                 "https://api.gofile.io/getAccountDetails",
                 params=params,
                 headers=headers,
+                timeout=self.__request_timeout,
             )
         except RequestException:
             self.__next_retry(
@@ -375,6 +461,10 @@ class GoFileSession:
                     )
             case 401 | 403:
                 raise InvalidTokenException("invalid token")
+            case 429:
+                raise RateLimitException(
+                    "rate limited (too many requests in a short period of time)"
+                )
             case _:
                 raise UnknownResponseException(
                     f"error while getting account details for token: {params['token']}\nstatus: {status}\nresponse code: {response.status_code}"
@@ -401,7 +491,10 @@ class GoFileSession:
         headers = {"Content-Type": "application/json"}
         try:
             response = put(
-                "https://api.gofile.io/copyContent", json=payload, headers=headers
+                "https://api.gofile.io/copyContent",
+                json=payload,
+                headers=headers,
+                timeout=self.__request_timeout,
             )
         except RequestException:
             self.__next_retry(
@@ -429,6 +522,10 @@ class GoFileSession:
                     )
             case 401 | 403:
                 raise InvalidTokenException("invalid token")
+            case 429:
+                raise RateLimitException(
+                    "rate limited (too many requests in a short period of time)"
+                )
             case _:
                 raise UnknownResponseException(
                     f"error while copying content from {sources_string} to {destination}\nstatus: {status}\nresponse code: {response.status_code}"
@@ -449,7 +546,10 @@ class GoFileSession:
         headers = {"Content-Type": "application/json"}
         try:
             response = delete(
-                "https://api.gofile.io/deleteContent", json=payload, headers=headers
+                "https://api.gofile.io/deleteContent",
+                json=payload,
+                headers=headers,
+                timeout=self.__request_timeout,
             )
         except RequestException:
             self.__next_retry(f"while deleting content from {targets_string}")
@@ -479,6 +579,10 @@ class GoFileSession:
                     )
             case 401 | 403:
                 raise InvalidTokenException("invalid token")
+            case 429:
+                raise RateLimitException(
+                    "rate limited (too many requests in a short period of time)"
+                )
             case _:
                 raise UnknownResponseException(
                     f"error while deleting content {targets_string}\nstatus: {status}\nresponse code: {response.status_code}"
@@ -521,7 +625,10 @@ class GoFileSession:
         headers = {"Content-Type": "application/json"}
         try:
             response = put(
-                "https://api.gofile.io/setOption", json=payload, headers=headers
+                "https://api.gofile.io/setOption",
+                json=payload,
+                headers=headers,
+                timeout=self.__request_timeout,
             )
         except RequestException:
             self.__next_retry(
@@ -554,11 +661,125 @@ class GoFileSession:
                     )
             case 401 | 403:
                 raise InvalidTokenException("invalid token")
+            case 429:
+                raise RateLimitException(
+                    "rate limited (too many requests in a short period of time)"
+                )
             case _:
                 raise UnknownResponseException(
                     f"error while setting option for content id: {content_id}\nstatus: {status}\nstatus code: {response.status_code}"
                 )
 
+    def upload_files(
+        self,
+        file_paths: Iterable[str],
+        parent_folder_id: str | None = None,
+        raw: bool | None = None,
+        priority: str | None = None,
+        rate_limit: float | None = None,
+    ) -> list[dict]:
+        """file_paths: The paths to the files that will be uploaded, in parallel.\n
+        parent_folder_id: The parent folder ID. If None is given, one new folder is created to recieve all of the files.\n
+        raw: Return raw json.\n
+        priority: The transfer scheduler priority class of every upload.\n
+        rate_limit: Upload limit in bytes per second for each file."""
+        if parent_folder_id == None:
+            parent_folder_id = self.create_folder(raw=False)
+        return run_batch(
+            self.__concurrency,
+            lambda file_path: self.upload_file(
+                file_path=file_path,
+                raw=raw,
+                parent_folder_id=parent_folder_id,
+                priority=priority,
+                rate_limit=rate_limit,
+            ),
+            file_paths,
+            operation="upload_file",
+            # upload time grows with file size, so only errors and rate limits say anything about load
+            check_latency=False,
+        )
+
+    def get_contents(
+        self,
+        content_ids: Iterable[str],
+        folder_password: str | None = None,
+        raw: bool | None = None,
+    ) -> dict[str, dict]:
+        """content_ids: Content IDs to get the contents of, in parallel.\n
+        folder_password: Password is only needed if you don't own the folders.\n
+        raw: Return raw json.\n
+        Returns a dict of content ID to its contents."""
+        content_ids = list(content_ids)
+        results = run_batch(
+            self.__concurrency,
+            lambda content_id: self.get_content(
+                content_id=content_id, folder_password=folder_password, raw=raw
+            ),
+            content_ids,
+            operation="get_content",
+        )
+        return dict(zip(content_ids, results))
+
+    def copy_contents(
+        self,
+        sources: Iterable[str],
+        destination: str,
+        chunk_size: int = 100,
+        raw: bool | None = None,
+    ) -> list[None | dict]:
+        """sources: Iterable of source content IDs, copied in parallel chunks.\n
+        destination: Content ID of destination folder\n
+        chunk_size: How many content IDs are sent per request.\n
+        raw: Return raw json"""
+        return run_batch(
+            self.__concurrency,
+            lambda chunk: self.copy_content(
+                sources=chunk, destination=destination, raw=raw
+            ),
+            self.__chunks(sources, chunk_size),
+            operation="copy_content",
+        )
+
+    def delete_contents(
+        self, targets: Iterable[str], chunk_size: int = 100, raw: bool | None = None
+    ) -> list[None | dict]:
+        """targets: Iterable of content IDs to delete, in parallel chunks.\n
+        chunk_size: How many content IDs are sent per request.\n
+        raw: Return raw json"""
+        return run_batch(
+            self.__concurrency,
+            lambda chunk: self.delete_content(targets=chunk, raw=raw),
+            self.__chunks(targets, chunk_size),
+            operation="delete_content",
+        )
+
+    def watch(
+        self,
+        folder_ids: Iterable[str],
+        min_interval: float = 5.0,
+        max_interval: float = 300.0,
+        requests_per_second: float = 2.0,
+        folder_password: str | None = None,
+        emit_initial: bool = False,
+    ) -> FolderWatcher:
+        """folder_ids: The folders to watch for added, removed and modified content.\n
+        min_interval: The shortest time in seconds between two polls of the same folder.\n
+        max_interval: The longest time in seconds between two polls of the same folder.\n
+        requests_per_second: The request budget shared by all watched folders.\n
+        folder_password: Password is only needed if you don't own the folders.\n
+        emit_initial: Emit "added" events for the content found by the first poll of a folder.\n
+        Iterate over the returned watcher's events() to get the changes."""
+        return FolderWatcher(
+            self,
+            folder_ids,
+            min_interval=min_interval,
+            max_interval=max_interval,
+            requests_per_second=requests_per_second,
+            folder_password=folder_password,
+            emit_initial=emit_initial,
+        )
+
     def set_token(self, new_token: str) -> None:
         self.__token = new_token
         self.refresh_account_info()
@@ -576,27 +797,133 @@ class GoFileSession:
         self.__raw = new_raw
 
     def __reset_retry_count(self) -> None:
-        self.__retry_count = 0
+        self.__retry_state.count = 0
 
     def __increase_retry_count(self, amount: int = 1) -> None:
-        self.__retry_count += amount
+        self.__retry_state.count = self.__retry_count + amount
 
     def __next_retry(self, while_doing: str | None = None) -> None:
+        self.__concurrency.record_congestion(f"retry: {while_doing}")
         if self.__retry_count == self.__max_retries:
             self.__reset_retry_count()
             self.__raise_max_retries(while_doing)
         self.__increase_retry_count()
 
+    def __create_folder(self, folder_name: str, parent_folder_id: str) -> dict:
+        payload = {
+            "token": self.__token,
+            "folderName": folder_name,
+            "parentFolderId": parent_folder_id,
+        }
+        headers = {"Content-Type": "application/json"}
+        try:
+            response = put(
+                "https://api.gofile.io/createFolder",
+                json=payload,
+                headers=headers,
+                timeout=self.__request_timeout,
+            )
+        except RequestException:
+            self.__next_retry(
+                f"creating folder {folder_name}\nparent folder id: {parent_folder_id}"
+            )
+            return self.__create_folder(folder_name, parent_folder_id)
+        self.__reset_retry_count()
+        response_json: dict = response.json()
+        status = response_json.get("status")
+        match response.status_code:
+            case 200:
+                if status == "ok":
+                    return response_json
+                elif status == WRONG_FOLDER:
+                    raise WrongFolderError(f"invalid parent folder: {parent_folder_id}")
+                else:
+                    raise UnknownResponseException(
+                        f"error while creating folder {folder_name}\nparent folder id: {parent_folder_id}"
+                    )
+            case 401 | 403:
+                raise InvalidTokenException("invalid token")
+            case 429:
+                raise RateLimitException(
+                    "rate limited (too many requests in a short period of time)"
+                )
+            case _:
+                raise UnknownResponseException(
+                    f"error while creating folder {folder_name}\nparent folder id: {parent_folder_id}\nresponse code: {response.status_code}"
+                )
+
+    @staticmethod
+    def __folder_options(
+        public: bool,
+        folder_password: str | None,
+        expiration_timestamp: float | int | None,
+        description: str | None,
+        tags: Iterable[str] | None,
+    ) -> list[tuple[str, bool | str | float | Iterable[str]]]:
+        options = [("public", public)]
+        if folder_password != None:
+            options.append(("password", folder_password))
+        if expiration_timestamp != None:
+            options.append(("expire", float(expiration_timestamp)))
+        if tags != None:
+            # the same value is joined once per folder, from several threads, so it can't be a generator
+            options.append(("tags", tuple(tags)))
+        if description != None:
+            options.append(("description", description))
+        return options
+
+    @staticmethod
+    def __check_tree(tree: Mapping, tree_path: str) -> None:
+        for name, children in tree.items():
+            # "/" separates the parts of the returned paths, so it would make them ambiguous
+            if not isinstance(name, str) or name == "" or "/" in name:
+                raise ValueError(
+                    f"invalid folder name in {tree_path or 'tree'}: {name!r}"
+                )
+            if children == None:
+                continue
+            if not isinstance(children, Mapping):
+                raise TypeError(
+                    f"subfolders of {tree_path + name} must be a mapping or None, not {type(children).__name__}"
+                )
+            GoFileSession.__check_tree(children, f"{tree_path}{name}/")
+
+    @staticmethod
+    def __local_tree(directory: str | PathLike) -> dict:
+        tree = {}
+        with scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    tree[entry.name] = GoFileSession.__local_tree(entry.path)
+        return tree
+
+    @staticmethod
+    def __chunks(items: Iterable[str], size: int) -> list[list[str]]:
+        items = list(items)
+        return [items[index : index + size] for index in range(0, len(items), size)]
+
     @staticmethod
     def __raise_max_retries(while_doing: str | None = None) -> NoReturn:
         if while_doing == None:
             raise CannotReachAPIException("max retries hit")
         raise CannotReachAPIException("max retries hit while " + while_doing)
 
+    @property
+    def __retry_count(self) -> int:
+        return getattr(self.__retry_state, "count", 0)
+
     @property
     def max_retries(self) -> int:
         return self.__max_retries
 
+    @property
+    def concurrency(self) -> AdaptiveConcurrencyController:
+        return self.__concurrency
+
+    @property
+    def scheduler(self) -> TransferScheduler | None:
+        return self.__scheduler
+
     @property
     def token(self) -> str:
         return self.__token
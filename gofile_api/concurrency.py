@@ -0,0 +1,305 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, NamedTuple, TypeVar
+from contextlib import contextmanager
+from threading import Condition
+from collections import deque
+from random import uniform
+from time import monotonic, sleep, time
+from .exceptions import CannotReachAPIException, RateLimitException
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Exceptions that mean the api (or the network) is overloaded, and we should back off.
+CONGESTION_EXCEPTIONS = (RateLimitException, CannotReachAPIException, TimeoutError)
+
+
+class ConcurrencyDecision(NamedTuple):
+    """A single change of the concurrency limit, kept for monitoring."""
+
+    timestamp: float
+    action: str  # "increase" or "decrease"
+    reason: str
+    old_limit: int
+    new_limit: int
+
+
+class AdaptiveConcurrencyController:
+    """AIMD (additive increase, multiplicative decrease) limiter for batch operations.\n
+    The limit grows by one for every `limit` healthy completions (so roughly once per round of requests),
+    and is multiplied by `backoff_factor` on rate limits, timeouts, unavailable servers or a high error rate.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 32,
+        backoff_factor: float = 0.5,
+        latency_target: float | None = None,
+        latency_tolerance: float | None = 2.0,
+        max_error_rate: float = 0.1,
+        window_size: int = 20,
+        history_size: int = 100,
+        congestion_hold_off: float = 1.0,
+        on_decision: Callable[[ConcurrencyDecision], None] | None = None,
+    ) -> None:
+        """initial_limit: The amount of parallel requests to start with.\n
+        min_limit: The limit never goes below this.\n
+        max_limit: The limit never goes above this.\n
+        backoff_factor: The limit is multiplied by this when backing off.\n
+        latency_target: Average latency in seconds above which the limit is decreased, for every operation. If None is given, latency_tolerance is used.\n
+        latency_tolerance: How many times slower than the fastest recent request of the same operation the average may be before the limit is decreased.
+        None disables latency checks.\n
+        max_error_rate: Fraction of failed requests in the window above which the limit is decreased.\n
+        window_size: How many recent requests the error rate and average latency are calculated over,
+        the fastest request of the last few windows is the latency baseline of an operation.\n
+        history_size: How many decisions are kept for monitoring.\n
+        congestion_hold_off: Seconds after a decrease in which retries and noServer responses are counted as the same congestion event.\n
+        on_decision: Called with a ConcurrencyDecision every time the limit changes."""
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError(
+                "limits must satisfy 1 <= min_limit <= initial_limit <= max_limit"
+            )
+        if not 0 < backoff_factor < 1:
+            raise ValueError("backoff_factor must be between 0 and 1")
+        self.__limit = initial_limit
+        self.__min_limit = min_limit
+        self.__max_limit = max_limit
+        self.__backoff_factor = backoff_factor
+        self.__latency_target = latency_target
+        self.__latency_tolerance = latency_tolerance
+        self.__max_error_rate = max_error_rate
+        self.__on_decision = on_decision
+        self.__in_flight = 0
+        self.__successes_since_increase = 0
+        self.__last_decrease = float("-inf")
+        self.__congestion_hold_off = congestion_hold_off
+        self.__congestion_window = congestion_hold_off
+        self.__window_size = window_size
+        # per operation, so fast listings don't make healthy uploads look slow
+        self.__latencies: dict[str, deque[float]] = {}
+        self.__baselines: dict[str, deque[float]] = {}
+        self.__outcomes: deque[bool] = deque(maxlen=window_size)
+        self.__decisions: deque[ConcurrencyDecision] = deque(maxlen=history_size)
+        self.__condition = Condition()
+
+    def acquire(self) -> float:
+        """Block until a slot is free, returns the start time to pass to release."""
+        with self.__condition:
+            while self.__in_flight >= self.__limit:
+                self.__condition.wait()
+            self.__in_flight += 1
+        return monotonic()
+
+    def release(
+        self,
+        started: float,
+        error: BaseException | None = None,
+        operation: str = "default",
+        check_latency: bool = True,
+    ) -> None:
+        """started: The value returned by acquire.\n
+        error: The exception the request failed with, if any.\n
+        operation: The kind of request, latency is only compared between requests of the same operation.\n
+        check_latency: False for requests whose duration depends on their size (like uploads), they then only count for the error rate.
+        """
+        latency = monotonic() - started
+        with self.__condition:
+            self.__in_flight -= 1
+            congested = isinstance(error, CONGESTION_EXCEPTIONS)
+            # errors caused by the caller say nothing about load
+            if error == None or congested:
+                self.__outcomes.append(not congested)
+            if congested:
+                self.__decrease(f"{type(error).__name__}: {error}", started)
+            elif error == None and not check_latency:
+                self.__on_success(started, None)
+            elif error == None:
+                if operation not in self.__latencies:
+                    self.__latencies[operation] = deque(maxlen=self.__window_size)
+                    self.__baselines[operation] = deque(maxlen=self.__window_size * 5)
+                self.__latencies[operation].append(latency)
+                self.__baselines[operation].append(latency)
+                self.__on_success(started, operation)
+            self.__condition.notify_all()
+
+    def record_congestion(self, reason: str) -> None:
+        """Report a congestion signal that did not end a request, like a retried timeout or a noServer response."""
+        with self.__condition:
+            self.__outcomes.append(False)
+            # signals within the hold-off of the last decrease belong to the same congestion event, so retry storms only back off once
+            self.__decrease(reason, monotonic() - self.__congestion_window)
+            self.__condition.notify_all()
+
+    @contextmanager
+    def slot(self, operation: str = "default", check_latency: bool = True):
+        """Context manager wrapping acquire and release around a single request.\n
+        operation, check_latency: See release."""
+        started = self.acquire()
+        try:
+            yield
+        except BaseException as error:
+            self.release(started, error, operation, check_latency)
+            raise
+        self.release(started, operation=operation, check_latency=check_latency)
+
+    def snapshot(self) -> dict:
+        """Current state of the controller, for monitoring."""
+        with self.__condition:
+            return {
+                "limit": self.__limit,
+                "in_flight": self.__in_flight,
+                "error_rate": self.__error_rate(),
+                "latency": {
+                    operation: {
+                        "average": self.__average_latency(operation),
+                        "baseline": min(self.__baselines[operation]),
+                    }
+                    for operation, latencies in self.__latencies.items()
+                    if latencies
+                },
+                "last_decision": self.__decisions[-1] if self.__decisions else None,
+            }
+
+    def __on_success(self, started: float, operation: str | None) -> None:
+        if self.__error_rate() > self.__max_error_rate:
+            self.__decrease("error rate above maximum", started)
+            return
+        if operation != None and not self.__latency_healthy(operation):
+            self.__decrease(f"{operation} latency above target", started)
+            return
+        if self.__in_flight + 1 < self.__limit:
+            return  # the current limit isn't being used, raising it wouldn't tell us anything
+        self.__successes_since_increase += 1
+        if self.__successes_since_increase >= self.__limit:
+            self.__successes_since_increase = 0
+            self.__set_limit(
+                self.__limit + 1, "increase", "healthy latency and error rate"
+            )
+
+    def __decrease(self, reason: str, started: float) -> None:
+        # requests started before the last decrease were sent under the old limit, so they don't count again
+        if started < self.__last_decrease:
+            return
+        self.__last_decrease = monotonic()
+        # remember how long requests took before the windows are cleared, see record_congestion
+        self.__congestion_window = max(
+            self.__congestion_hold_off, self.__longest_average_latency()
+        )
+        self.__successes_since_increase = 0
+        self.__outcomes.clear()
+        for latencies in self.__latencies.values():
+            latencies.clear()
+        self.__set_limit(int(self.__limit * self.__backoff_factor), "decrease", reason)
+
+    def __set_limit(self, new_limit: int, action: str, reason: str) -> None:
+        new_limit = max(self.__min_limit, min(self.__max_limit, new_limit))
+        if new_limit == self.__limit:
+            return
+        decision = ConcurrencyDecision(time(), action, reason, self.__limit, new_limit)
+        self.__limit = new_limit
+        self.__decisions.append(decision)
+        if self.__on_decision != None:
+            self.__on_decision(decision)
+
+    def __latency_healthy(self, operation: str) -> bool:
+        average = self.__average_latency(operation)
+        if average == None:
+            return True
+        if self.__latency_target != None:
+            return average <= self.__latency_target
+        if self.__latency_tolerance == None:
+            return True
+        return average <= min(self.__baselines[operation]) * self.__latency_tolerance
+
+    def __error_rate(self) -> float:
+        if not self.__outcomes:
+            return 0.0
+        return self.__outcomes.count(False) / len(self.__outcomes)
+
+    def __average_latency(self, operation: str) -> float | None:
+        latencies = self.__latencies.get(operation)
+        if not latencies:
+            return None
+        return sum(latencies) / len(latencies)
+
+    def __longest_average_latency(self) -> float:
+        return max(
+            (
+                self.__average_latency(operation) or 0.0
+                for operation in self.__latencies
+            ),
+            default=0.0,
+        )
+
+    @property
+    def limit(self) -> int:
+        return self.__limit
+
+    @property
+    def in_flight(self) -> int:
+        return self.__in_flight
+
+    @property
+    def min_limit(self) -> int:
+        return self.__min_limit
+
+    @property
+    def max_limit(self) -> int:
+        return self.__max_limit
+
+    @property
+    def decisions(self) -> list[ConcurrencyDecision]:
+        with self.__condition:
+            return list(self.__decisions)
+
+
+def run_batch(
+    controller: AdaptiveConcurrencyController,
+    function: Callable[[T], R],
+    items: Iterable[T],
+    return_exceptions: bool = False,
+    operation: str = "default",
+    max_retries: int = 5,
+    retry_delay: float = 1.0,
+    check_latency: bool = True,
+) -> list:
+    """Call function on every item, as many at a time as the controller allows.\n
+    Results are returned in the same order as items.\n
+    return_exceptions: Put exceptions in the result list instead of raising the first one.\n
+    operation: The kind of request, see AdaptiveConcurrencyController.release.\n
+    max_retries: How many times an item that failed because of congestion (rate limits, timeouts) is retried.\n
+    retry_delay: Seconds to wait before the first retry, doubled for every next one.\n
+    check_latency: See AdaptiveConcurrencyController.release."""
+
+    def run_one(item: T) -> R:
+        for attempt in range(max_retries + 1):
+            try:
+                with controller.slot(operation, check_latency):
+                    return function(item)
+            except CONGESTION_EXCEPTIONS:
+                if attempt == max_retries:
+                    raise
+            # the controller already lowered the limit, wait a bit so the api can recover
+            sleep(uniform(0.5, 1.0) * retry_delay * 2**attempt)
+
+    items = list(items)
+    if not items:
+        return []
+    with ThreadPoolExecutor(
+        max_workers=min(controller.max_limit, len(items))
+    ) as executor:
+        futures = [executor.submit(run_one, item) for item in items]
+        results = []
+        for future in futures:
+            error = future.exception()
+            if error == None:
+                results.append(future.result())
+            elif return_exceptions:
+                results.append(error)
+            else:
+                for pending in futures:
+                    pending.cancel()
+                raise error
+    return results
@@ -35,6 +35,14 @@ class ContentNotFoundError(Exception):
     ...
 
 
+class TreeCreationError(Exception):
+    """Raised by create_tree when a folder or option could not be created, folder_ids has the folders that were created."""
+
+    def __init__(self, message: str, folder_ids: dict[str, str]) -> None:
+        super().__init__(message)
+        self.folder_ids = folder_ids
+
+
 # Connection Exceptions
 class RateLimitException(Exception):
     ...
@@ -0,0 +1,289 @@
+from typing import BinaryIO, Iterator
+from contextlib import contextmanager
+from heapq import heappop, heappush
+from threading import Condition
+from itertools import count
+from random import choices
+from time import monotonic, sleep
+
+DEFAULT_PRIORITIES = ("interactive", "normal", "bulk")
+
+
+class TokenBucket:
+    """Token bucket over bytes, the balance may go negative so a large chunk is paid for afterwards."""
+
+    def __init__(self, rate: float, capacity: float | None = None) -> None:
+        """rate: Bytes per second.\n
+        capacity: The most bytes that can be sent in a burst. Default is one second worth of bytes.
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity != None else rate
+        self.tokens = self.capacity
+        self.__updated = monotonic()
+
+    def refill(self) -> None:
+        now = monotonic()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.__updated) * self.rate
+        )
+        self.__updated = now
+
+    def time_until_available(self) -> float:
+        """Seconds until the balance is no longer negative."""
+        self.refill()
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.rate
+
+
+class Transfer:
+    """A single admitted transfer, created by TransferScheduler.transfer."""
+
+    def __init__(
+        self, scheduler: "TransferScheduler", priority: str, rate_limit: float | None
+    ) -> None:
+        self.__scheduler = scheduler
+        self.__priority = priority
+        self.__bucket = TokenBucket(rate_limit) if rate_limit != None else None
+        self.__bytes = 0
+        self.__queue_wait = 0.0
+
+    def throttle(self, byte_count: int) -> None:
+        """Wait until byte_count bytes may be sent, by both the per-transfer and the global limit."""
+        if self.__bucket != None:
+            sleep(self.__bucket.time_until_available())
+            self.__bucket.tokens -= byte_count
+        self.__queue_wait += self.__scheduler._consume(self.__priority, byte_count)
+        self.__bytes += byte_count
+
+    @property
+    def priority(self) -> str:
+        return self.__priority
+
+    @property
+    def bytes_sent(self) -> int:
+        return self.__bytes
+
+    @property
+    def queue_wait(self) -> float:
+        """Seconds spent waiting behind other transfers for the global bandwidth."""
+        return self.__queue_wait
+
+
+class TransferScheduler:
+    """Shares bandwidth and transfer slots between transfers of different priority classes.\n
+    When transfers wait for bytes or for a slot, the ones of the most important class go first,
+    and the most important class never waits for a slot at all."""
+
+    def __init__(
+        self,
+        rate_limit: float | None = None,
+        burst: float | None = None,
+        max_active: int | None = None,
+        priorities: tuple[str, ...] = DEFAULT_PRIORITIES,
+        default_priority: str = "normal",
+    ) -> None:
+        """rate_limit: Global limit in bytes per second for all transfers together. If None is given, only the per-transfer limits apply.\n
+        burst: The most bytes that can be sent at once globally. Default is one second worth of bytes.\n
+        max_active: How many transfers may run at the same time, the rest wait in priority order.
+        Transfers of the most important class are not counted. If None is given, there is no limit.\n
+        priorities: The priority class names, most important first.\n
+        default_priority: The class used when None is given as a priority."""
+        if default_priority not in priorities:
+            raise ValueError(
+                f"default priority {default_priority} is not one of {priorities}"
+            )
+        self.__bucket = TokenBucket(rate_limit, burst) if rate_limit != None else None
+        self.__max_active = max_active
+        self.__priorities = tuple(priorities)
+        self.__default_priority = default_priority
+        self.__active = 0
+        self.__slot_queue: list[tuple[int, int]] = []
+        self.__byte_queue: list[tuple[int, int]] = []
+        self.__order = count()
+        self.__condition = Condition()
+        self.__stats = {
+            priority: {
+                "transfers": 0,
+                "bytes": 0,
+                "queue_wait": 0.0,
+                "max_queue_wait": 0.0,
+                "active_time": 0.0,
+            }
+            for priority in self.__priorities
+        }
+        # wall-clock time every class had at least one transfer running, for its achieved rate
+        self.__class_active = {priority: 0 for priority in self.__priorities}
+        self.__class_active_since = {priority: 0.0 for priority in self.__priorities}
+
+    @contextmanager
+    def transfer(
+        self, priority: str | None = None, rate_limit: float | None = None
+    ) -> Iterator[Transfer]:
+        """Wait for a transfer slot, then yield a Transfer to throttle the sent bytes through.\n
+        priority: One of the priority class names. If None is given, the default priority is used.\n
+        rate_limit: Limit in bytes per second for this transfer alone."""
+        priority = self.__check_priority(priority)
+        counted = self.__priorities.index(priority) != 0
+        queued = monotonic()
+        with self.__condition:
+            if counted:
+                ticket = (self.__priorities.index(priority), next(self.__order))
+                heappush(self.__slot_queue, ticket)
+                while self.__slot_queue[0] != ticket or (
+                    self.__max_active != None and self.__active >= self.__max_active
+                ):
+                    self.__condition.wait()
+                heappop(self.__slot_queue)
+                self.__active += 1
+            if self.__class_active[priority] == 0:
+                self.__class_active_since[priority] = monotonic()
+            self.__class_active[priority] += 1
+            self.__condition.notify_all()
+        slot_wait = monotonic() - queued
+        transfer = Transfer(self, priority, rate_limit)
+        try:
+            yield transfer
+        finally:
+            with self.__condition:
+                if counted:
+                    self.__active -= 1
+                self.__class_active[priority] -= 1
+                stats = self.__stats[priority]
+                if self.__class_active[priority] == 0:
+                    stats["active_time"] += (
+                        monotonic() - self.__class_active_since[priority]
+                    )
+                queue_wait = slot_wait + transfer.queue_wait
+                stats["transfers"] += 1
+                stats["queue_wait"] += queue_wait
+                stats["max_queue_wait"] = max(stats["max_queue_wait"], queue_wait)
+                self.__condition.notify_all()
+
+    def stats(self) -> dict[str, dict]:
+        """Per priority class: finished transfers, bytes sent, average and max queue wait in seconds (for a slot and for bandwidth),
+        and the achieved rate in bytes per second over the time the class had transfers running.
+        """
+        with self.__condition:
+            now = monotonic()
+            report = {}
+            for priority, stats in self.__stats.items():
+                transfers = stats["transfers"]
+                active_time = stats["active_time"]
+                if self.__class_active[priority] > 0:
+                    active_time += now - self.__class_active_since[priority]
+                report[priority] = {
+                    "transfers": transfers,
+                    "bytes": stats["bytes"],
+                    "average_queue_wait": (
+                        stats["queue_wait"] / transfers if transfers else 0.0
+                    ),
+                    "max_queue_wait": stats["max_queue_wait"],
+                    "bytes_per_second": (
+                        stats["bytes"] / active_time if active_time else 0.0
+                    ),
+                }
+            return report
+
+    def _consume(self, priority: str, byte_count: int) -> float:
+        """Wait for byte_count bytes of global bandwidth, returns the seconds spent waiting."""
+        with self.__condition:
+            self.__stats[priority]["bytes"] += byte_count
+            if self.__bucket == None:
+                return 0.0
+            queued = monotonic()
+            ticket = (self.__priorities.index(priority), next(self.__order))
+            heappush(self.__byte_queue, ticket)
+            while True:
+                if self.__byte_queue[0] == ticket:
+                    wait = self.__bucket.time_until_available()
+                    if wait == 0:
+                        break
+                    self.__condition.wait(wait)
+                else:
+                    self.__condition.wait()
+            heappop(self.__byte_queue)
+            self.__bucket.tokens -= byte_count
+            self.__condition.notify_all()
+            return monotonic() - queued
+
+    def __check_priority(self, priority: str | None) -> str:
+        if priority == None:
+            return self.__default_priority
+        if priority not in self.__priorities:
+            raise ValueError(
+                f"unknown priority {priority}, must be one of {self.__priorities}"
+            )
+        return priority
+
+    @property
+    def priorities(self) -> tuple[str, ...]:
+        return self.__priorities
+
+    @property
+    def active(self) -> int:
+        return self.__active
+
+
+class ThrottledMultipartBody:
+    """A multipart/form-data request body that streams a file through a Transfer,
+    so requests sends it at the pace the scheduler allows instead of all at once."""
+
+    def __init__(
+        self,
+        fields: dict[str, str],
+        file_field: str,
+        file_name: str,
+        file: BinaryIO,
+        file_size: int,
+        transfer: Transfer,
+        chunk_size: int = 64 * 1024,
+    ) -> None:
+        boundary = "".join(choices("abcdefghijklmnopqrstuvwxyz1234567890", k=32))
+        head = "".join(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'
+            for name, value in fields.items()
+        )
+        head += (
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{file_field}"; filename="{file_name}"\r\n'
+            "Content-Type: application/octet-stream\r\n\r\n"
+        )
+        self.__head = head.encode()
+        self.__tail = f"\r\n--{boundary}--\r\n".encode()
+        self.__file = file
+        self.__length = len(self.__head) + file_size + len(self.__tail)
+        self.__transfer = transfer
+        self.__chunk_size = chunk_size
+        self.__stage = 0  # 0 = head, 1 = file, 2 = tail, 3 = done
+        self.__content_type = f"multipart/form-data; boundary={boundary}"
+
+    def read(self, size: int = -1) -> bytes:
+        if size == None or size < 0:
+            size = self.__chunk_size
+        size = min(size, self.__chunk_size)
+        data = b""
+        while not data and self.__stage < 3:
+            if self.__stage == 0:
+                data, self.__head, self.__stage = self.__head, b"", 1
+            elif self.__stage == 1:
+                data = self.__file.read(size)
+                if not data:
+                    self.__stage = 2
+            else:
+                data, self.__stage = self.__tail, 3
+        if data:
+            self.__transfer.throttle(len(data))
+        return data
+
+    def __iter__(self) -> Iterator[bytes]:
+        while data := self.read():
+            yield data
+
+    def __len__(self) -> int:
+        return self.__length
+
+    @property
+    def content_type(self) -> str:
+        return self.__content_type
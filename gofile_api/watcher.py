@@ -0,0 +1,218 @@
+from typing import TYPE_CHECKING, Iterable, Iterator, NamedTuple
+from heapq import heappop, heappush
+from time import monotonic
+from threading import Event
+from .concurrency import CONGESTION_EXCEPTIONS, run_batch
+from .exceptions import ContentExpiredError, ContentNotFoundError
+
+if TYPE_CHECKING:
+    from .api import GoFileSession
+
+# Content fields that are compared to detect modifications, counters like downloadCount are left out on purpose.
+FINGERPRINT_FIELDS = ("type", "name", "size", "md5", "childs")
+
+
+class WatchEvent(NamedTuple):
+    """A change in a watched folder."""
+
+    kind: str  # "added", "removed" or "modified"
+    folder_id: str
+    content_id: str
+    content: dict | None  # None for removed content, only the fingerprint of it is kept
+
+
+class FolderWatcher:
+    """Polls folders for added, removed and modified content.\n
+    Every folder is polled on its own interval, which halves when the folder changed and grows by half when it didn't,
+    while the total amount of requests is kept below requests_per_second."""
+
+    def __init__(
+        self,
+        session: "GoFileSession",
+        folder_ids: Iterable[str],
+        min_interval: float = 5.0,
+        max_interval: float = 300.0,
+        requests_per_second: float = 2.0,
+        folder_password: str | None = None,
+        emit_initial: bool = False,
+    ) -> None:
+        """session: The session used to get the folder contents.\n
+        folder_ids: The folders to watch.\n
+        min_interval: The shortest time in seconds between two polls of the same folder.\n
+        max_interval: The longest time in seconds between two polls of the same folder.\n
+        requests_per_second: The request budget shared by all watched folders.\n
+        folder_password: Password is only needed if you don't own the folders.\n
+        emit_initial: Emit "added" events for the content found by the first poll of a folder.
+        """
+        if not 0 < min_interval <= max_interval:
+            raise ValueError("intervals must satisfy 0 < min_interval <= max_interval")
+        if requests_per_second <= 0:
+            raise ValueError("requests_per_second must be positive")
+        self.__session = session
+        self.__min_interval = min_interval
+        self.__max_interval = max_interval
+        self.__requests_per_second = requests_per_second
+        self.__folder_password = folder_password
+        self.__emit_initial = emit_initial
+        self.__budget = max(1.0, requests_per_second)
+        self.__budget_updated = monotonic()
+        self.__intervals: dict[str, float] = {}
+        self.__next_polls: dict[str, float] = {}
+        self.__snapshots: dict[str, dict[str, int] | None] = {}
+        self.__errors: dict[str, Exception] = {}
+        self.__schedule: list[tuple[float, str]] = []
+        self.__stopped = Event()
+        for folder_id in folder_ids:
+            self.add(folder_id)
+
+    def add(self, folder_id: str) -> None:
+        """Start watching a folder, it is polled as soon as the budget allows."""
+        if folder_id in self.__intervals:
+            return
+        self.__intervals[folder_id] = self.__min_interval
+        self.__snapshots[folder_id] = None
+        self.__next_polls[folder_id] = monotonic()
+        heappush(self.__schedule, (self.__next_polls[folder_id], folder_id))
+
+    def remove(self, folder_id: str) -> None:
+        """Stop watching a folder."""
+        self.__intervals.pop(folder_id, None)
+        self.__snapshots.pop(folder_id, None)
+        self.__next_polls.pop(folder_id, None)
+        self.__errors.pop(folder_id, None)
+
+    def poll(self) -> list[WatchEvent]:
+        """Poll every folder that is due, as far as the request budget allows, and return the changes.\n
+        Does not wait, returns an empty list if nothing is due.\n
+        Folders that fail with any other error are polled again later, the error is kept in errors until the next successful poll.
+        """
+        due = self.__take_due()
+        if not due:
+            return []
+        results = run_batch(
+            self.__session.concurrency,
+            lambda folder_id: self.__session.get_content(
+                content_id=folder_id, folder_password=self.__folder_password, raw=False
+            ),
+            due,
+            return_exceptions=True,
+            operation="get_content",
+            max_retries=0,  # congested folders are polled again later instead
+        )
+        events = []
+        for folder_id, result in zip(due, results):
+            if folder_id not in self.__intervals:
+                continue  # removed while polling
+            if isinstance(result, (ContentNotFoundError, ContentExpiredError)):
+                events.extend(
+                    WatchEvent("removed", folder_id, content_id, None)
+                    for content_id in self.__snapshots[folder_id] or ()
+                )
+                self.remove(folder_id)
+                continue
+            if isinstance(result, Exception):
+                if not isinstance(result, CONGESTION_EXCEPTIONS):
+                    self.__errors[folder_id] = result
+                self.__reschedule(folder_id, self.__intervals[folder_id] * 2)
+                continue
+            self.__errors.pop(folder_id, None)
+            changes = self.__diff(folder_id, result)
+            events.extend(changes)
+            if changes:
+                self.__reschedule(folder_id, self.__intervals[folder_id] * 0.5)
+            else:
+                self.__reschedule(folder_id, self.__intervals[folder_id] * 1.5)
+        return events
+
+    def events(self) -> Iterator[WatchEvent]:
+        """Poll forever (until stop is called), yielding every change."""
+        while not self.__stopped.is_set():
+            yield from self.poll()
+            self.__stopped.wait(self.__time_until_next_poll())
+
+    def stop(self) -> None:
+        """Make events return after the current poll."""
+        self.__stopped.set()
+
+    def __diff(self, folder_id: str, contents: dict) -> list[WatchEvent]:
+        snapshot = {
+            content_id: self.__fingerprint(content)
+            for content_id, content in contents.items()
+        }
+        previous = self.__snapshots[folder_id]
+        self.__snapshots[folder_id] = snapshot
+        if previous == None:
+            if not self.__emit_initial:
+                return []
+            previous = {}
+        events = []
+        for content_id, fingerprint in snapshot.items():
+            if content_id not in previous:
+                events.append(
+                    WatchEvent("added", folder_id, content_id, contents[content_id])
+                )
+            elif previous[content_id] != fingerprint:
+                events.append(
+                    WatchEvent("modified", folder_id, content_id, contents[content_id])
+                )
+        events.extend(
+            WatchEvent("removed", folder_id, content_id, None)
+            for content_id in previous
+            if content_id not in snapshot
+        )
+        return events
+
+    def __take_due(self) -> list[str]:
+        now = monotonic()
+        self.__budget = min(
+            max(1.0, self.__requests_per_second),
+            self.__budget + (now - self.__budget_updated) * self.__requests_per_second,
+        )
+        self.__budget_updated = now
+        due = []
+        while self.__schedule and self.__schedule[0][0] <= now and self.__budget >= 1:
+            next_poll, folder_id = heappop(self.__schedule)
+            if self.__next_polls.get(folder_id) != next_poll:
+                continue  # stale entry of a removed or re-added folder
+            due.append(folder_id)
+            self.__budget -= 1
+        return due
+
+    def __reschedule(self, folder_id: str, interval: float) -> None:
+        interval = max(self.__min_interval, min(self.__max_interval, interval))
+        self.__intervals[folder_id] = interval
+        self.__next_polls[folder_id] = monotonic() + interval
+        heappush(self.__schedule, (self.__next_polls[folder_id], folder_id))
+
+    def __time_until_next_poll(self) -> float:
+        if not self.__schedule:
+            return self.__min_interval
+        until_due = self.__schedule[0][0] - monotonic()
+        until_budget = (1 - self.__budget) / self.__requests_per_second
+        return max(0.0, until_due, until_budget)
+
+    @staticmethod
+    def __fingerprint(content: dict) -> int:
+        return hash(
+            tuple(
+                tuple(value) if isinstance(value, list) else value
+                for value in (content.get(field) for field in FINGERPRINT_FIELDS)
+            )
+        )
+
+    @property
+    def folder_ids(self) -> list[str]:
+        return list(self.__intervals)
+
+    @property
+    def errors(self) -> dict[str, Exception]:
+        """The last error of every folder whose latest poll failed."""
+        return dict(self.__errors)
+
+    @property
+    def intervals(self) -> dict[str, float]:
+        return dict(self.__intervals)
+
+    @property
+    def requests_per_second(self) -> float:
+        return self.__requests_per_second